@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Benchmark every GET /api/* route: latency percentiles, response size and rows/sec
+
+By default the app is imported in-process and pointed at the fixture databases made by
+benchmark_fixture.py (the background caches are primed synchronously first and their build
+times recorded). With --base-url the same routes are timed against a running server.
+
+Results are written to benchmark_results/<timestamp>-<commit>.json; --compare checks them
+against an earlier result file and reports routes whose median latency regressed.
+
+    python3 benchmark_endpoints.py --db-host /tmp/pgdata --db-user postgres --compare latest
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+
+# Server-sent event streams never finish, so they cannot be timed as requests
+SKIPPED_ROUTES = {'/api/stream', '/api/admin/stream'}
+
+# Query strings that make a route do representative work
+ROUTE_QUERIES = {
+    '/api/schedule': 'limit=500',
+    '/api/historical-runs': 'limit=1000',
+    '/api/historical-runs/export': 'format=ndjson',
+    '/api/ai-schedule-optimization': 'days=90',
+}
+
+# Background caches built off the request path, primed before timing in-process
+PRIMED_REFRESHERS = ['tool_catalog_refresher', 'run_snapshot_refresher', 'rollup_refresher',
+                     'spc_refresher', 'exact_count_refresher']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the /api/* routes')
+    parser.add_argument('--db-host', default='localhost', help='fixture server host or unix socket directory')
+    parser.add_argument('--db-port', default='5432')
+    parser.add_argument('--db-user', default='postgres')
+    parser.add_argument('--production-db', default='mesprod_bench')
+    parser.add_argument('--staging-db', default='reactor_scheduling_bench')
+    parser.add_argument('--snapshot-dir', help='run snapshot directory (default: a fresh temporary directory)')
+    parser.add_argument('--base-url', help='time a running server instead of the app in-process')
+    parser.add_argument('--iterations', type=int, default=5, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed requests per route')
+    parser.add_argument('--routes', nargs='*', help='only these routes (default: every GET /api/* route)')
+    parser.add_argument('--output', help='result file (default: benchmark_results/<timestamp>-<commit>.json)')
+    parser.add_argument('--compare', help="earlier result file to compare against, or 'latest'")
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed median latency increase (0.2 = 20%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='ignore regressions smaller than this')
+    return parser.parse_args()
+
+def configure_environment(args):
+    """Point the app at the fixture databases before it is imported"""
+    for prefix, database in (('PRODUCTION', args.production_db), ('STAGING', args.staging_db)):
+        os.environ[f'{prefix}_DB_HOST'] = args.db_host
+        os.environ[f'{prefix}_DB_PORT'] = str(args.db_port)
+        os.environ[f'{prefix}_DB_NAME'] = database
+        os.environ[f'{prefix}_DB_USER'] = args.db_user
+    os.environ['RUN_SNAPSHOT_DIR'] = args.snapshot_dir or tempfile.mkdtemp(prefix='run_snapshot_')
+
+class InProcessClient:
+    def __init__(self, app_module):
+        self.client = app_module.app.test_client()
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.content_type or '', response.get_data()
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def get(self, path):
+        try:
+            with urllib.request.urlopen(self.base_url + path) as response:
+                return response.status, response.headers.get('Content-Type', ''), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Content-Type', ''), e.read()
+
+def count_rows(content_type, body):
+    """Records in a response: lines of NDJSON/CSV, else the longest list in the JSON document"""
+    if 'ndjson' in content_type or 'csv' in content_type:
+        return body.count(b'\n')
+    try:
+        document = json.loads(body)
+    except ValueError:
+        return 0
+    longest = 0
+    pending = [(document, 0)]
+    while pending:
+        value, depth = pending.pop()
+        if isinstance(value, list):
+            longest = max(longest, len(value))
+        elif isinstance(value, dict) and depth < 3:
+            pending.extend((child, depth + 1) for child in value.values())
+    return longest
+
+def first_id(client, path, list_key, id_key):
+    status, _, body = client.get(path)
+    if status != 200:
+        return None
+    items = json.loads(body).get(list_key) or []
+    return items[0][id_key] if items else None
+
+def benchmark_routes(app_module, client, args):
+    """Paths to time: every GET /api/* rule, with sample ids filled into <converter> segments"""
+    sample_ids = {
+        'reactor_id': first_id(client, '/api/reactors', 'reactors', 'reactor_id'),
+        'entry_id': first_id(client, '/api/schedule', 'schedule', 'entry_id'),
+    }
+    paths = []
+    for rule in sorted(app_module.app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if 'GET' not in rule.methods or not rule.rule.startswith('/api/') or rule.rule in SKIPPED_ROUTES:
+            continue
+        if args.routes and rule.rule not in args.routes:
+            continue
+        values = {name: sample_ids.get(name) for name in rule.arguments}
+        if None in values.values():
+            print(f"  skipping {rule.rule}: no sample value for {sorted(rule.arguments)}")
+            continue
+        path = rule.rule
+        for name, value in values.items():
+            path = path.replace(f'<int:{name}>', str(value)).replace(f'<{name}>', str(value))
+        query = ROUTE_QUERIES.get(rule.rule)
+        paths.append((rule.rule, f'{path}?{query}' if query else path))
+    return paths
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def time_route(client, path, args):
+    for _ in range(args.warmup):
+        client.get(path)
+    latencies = []
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        status, content_type, body = client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    rows = count_rows(content_type, body)
+    median = statistics.median(latencies)
+    return {
+        'path': path,
+        'status': status,
+        'iterations': len(latencies),
+        'min_ms': round(latencies[0], 2),
+        'p50_ms': round(median, 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'max_ms': round(latencies[-1], 2),
+        'mean_ms': round(statistics.mean(latencies), 2),
+        'bytes': len(body),
+        'rows': rows,
+        'rows_per_sec': round(rows / (median / 1000), 1) if median > 0 else None,
+        'error': json.loads(body).get('error') if status >= 400 and 'json' in content_type else None
+    }
+
+def prime_caches(app_module):
+    """Build the background caches synchronously, recording how long each build took"""
+    priming = {}
+    for name in PRIMED_REFRESHERS:
+        refresher = getattr(app_module, name)
+        print(f"  priming {refresher.name}", flush=True)
+        refresher.refresh_now()
+        priming[refresher.name] = {'seconds': refresher.last_duration, 'error': refresher.last_error}
+    return priming
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def fixture_scale(args):
+    """Scale parameters recorded on the fixture database by benchmark_fixture.py"""
+    import psycopg2
+    try:
+        conn = psycopg2.connect(host=args.db_host, port=args.db_port, user=args.db_user, dbname=args.production_db)
+        cur = conn.cursor()
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = current_database()")
+        comment = cur.fetchone()[0] or ''
+        conn.close()
+        return json.loads(comment.split(' ', 3)[3]) if comment.startswith('reactor benchmark fixture ') else None
+    except (psycopg2.Error, ValueError, IndexError):
+        return None
+
+def compare_results(baseline, results, args):
+    """Print per-route median changes; returns the routes that regressed past the threshold"""
+    previous = {route['route']: route for route in baseline['routes']}
+    regressions = []
+    print(f"\nCompared with {baseline['revision']} ({baseline['timestamp']}):")
+    for route in results['routes']:
+        before = previous.get(route['route'])
+        if before is None:
+            print(f"  {route['route']:45} new")
+            continue
+        delta = route['p50_ms'] - before['p50_ms']
+        change = delta / before['p50_ms'] if before['p50_ms'] else 0.0
+        regressed = change > args.threshold and delta > args.min_delta_ms
+        if regressed:
+            regressions.append(route['route'])
+        print(f"  {route['route']:45} {before['p50_ms']:9.1f} -> {route['p50_ms']:9.1f} ms "
+              f"({change:+.0%}){'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    args = parse_args()
+    if not args.base_url:
+        configure_environment(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'mode': 'http' if args.base_url else 'in-process',
+        'base_url': args.base_url,
+        'fixture': None if args.base_url else fixture_scale(args),
+        'iterations': args.iterations,
+        'priming': {},
+        'routes': []
+    }
+    if args.base_url:
+        client = HttpClient(args.base_url)
+    else:
+        print("Priming background caches")
+        results['priming'] = prime_caches(app_module)
+        client = InProcessClient(app_module)
+
+    print(f"{'route':45} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'rows':>8} {'rows/sec':>12}")
+    for route, path in benchmark_routes(app_module, client, args):
+        result = dict(route=route, **time_route(client, path, args))
+        results['routes'].append(result)
+        rate = f"{result['rows_per_sec']:,.0f}" if result['rows_per_sec'] is not None else '-'
+        print(f"{route:45} {result['status']:>6} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+              f"{result['rows']:>8,} {rate:>12}", flush=True)
+
+    baseline_path = args.compare
+    if baseline_path == 'latest':
+        earlier = sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')), key=os.path.getmtime)
+        baseline_path = earlier[-1] if earlier else None
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{results['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare_results(json.load(f), results, args)
+        if regressions:
+            print(f"\n{len(regressions)} route(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+    elif args.compare:
+        print("No earlier results to compare against")
+
+if __name__ == '__main__':
+    main()
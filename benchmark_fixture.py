@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic mesprod fixture in a local PostgreSQL server for benchmarking
+
+Creates a production-shaped database (mes.gt_tool_family, mes.gt_tools, mes.gt_process_runs,
+mes.gt_wafers, quarterly mes.gt_spc_det_<q>q_<year> partitions and schedule_entries) plus an
+empty staging database, at a configurable scale. Rows are generated server side with
+generate_series in batches, so tens of millions of runs load without leaving the database.
+
+Databases created here are tagged with a COMMENT; --drop only ever replaces tagged databases.
+
+    python3 benchmark_fixture.py --host /tmp/pgdata --user postgres --runs 20000000 --drop
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import psycopg2
+import psycopg2.sql as sql
+
+FIXTURE_TAG = 'reactor benchmark fixture'
+
+TOOL_FAMILIES = ['AMT', 'ADE', 'AIX', 'VIS', 'SYS', 'OTHER']
+RECIPE_PREFIXES = ['EPI-DEP', 'CVD', 'CLEAN', 'ETCH', 'ANNEAL', 'IMPLANT', 'POLISH', 'EPI']
+RECIPES_PER_TOOL = 8
+PRODUCT_TYPES = ['Epi', 'Poly', 'Clean']
+SPC_EVENTS = [  # (event name, mean, spread)
+    ('Site FPT Pct Usable Area', 98.5, 0.4),
+    ('Site TIR Pct Usable Area', 97.5, 0.8),
+    ('3 Point Bow', -10.5, 1.2),
+    ('Thickness Uniformity', 2.15, 0.12),
+    ('Resistivity', 15.5, 0.4),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate a synthetic mesprod benchmark fixture')
+    parser.add_argument('--host', default='localhost', help='server host or unix socket directory')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--production-db', default='mesprod_bench')
+    parser.add_argument('--staging-db', default='reactor_scheduling_bench')
+    parser.add_argument('--runs', type=int, default=1_000_000, help='rows in mes.gt_process_runs')
+    parser.add_argument('--tools', type=int, default=200, help='rows in mes.gt_tools')
+    parser.add_argument('--recipes', type=int, default=120, help='distinct recipes')
+    parser.add_argument('--products', type=int, default=500, help='distinct products')
+    parser.add_argument('--days', type=int, default=400, help='history covered by runs and schedule entries')
+    parser.add_argument('--wafers', type=int, default=500_000, help='rows in mes.gt_wafers')
+    parser.add_argument('--spc-quarters', type=int, default=8, help='quarterly SPC partitions, ending with the current one')
+    parser.add_argument('--spc-rows', type=int, default=250_000, help='measurements per SPC partition')
+    parser.add_argument('--schedule-entries', type=int, default=50_000)
+    parser.add_argument('--batch-size', type=int, default=1_000_000, help='rows per INSERT')
+    parser.add_argument('--seed', type=float, default=0.42, help='setseed() value in [-1, 1]')
+    parser.add_argument('--drop', action='store_true', help='replace existing fixture databases')
+    return parser.parse_args()
+
+def connect(args, dbname):
+    return psycopg2.connect(host=args.host, port=args.port, user=args.user, dbname=dbname)
+
+def create_databases(args, names, scale):
+    """Create tagged, empty databases; existing ones are only replaced with --drop, and only if tagged
+
+    Every name is checked before anything is dropped.
+    """
+    conn = connect(args, 'postgres')
+    conn.autocommit = True
+    cur = conn.cursor()
+    existing = []
+    for name in names:
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s", (name,))
+        row = cur.fetchone()
+        if row is None:
+            continue
+        if not args.drop:
+            sys.exit(f"Database {name} already exists; pass --drop to replace it")
+        if not (row[0] or '').startswith(FIXTURE_TAG):
+            sys.exit(f"Refusing to drop {name}: it was not created by this script")
+        existing.append(name)
+    for name in names:
+        if name in existing:
+            cur.execute(sql.SQL("DROP DATABASE {}").format(sql.Identifier(name)))
+        cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+        cur.execute(sql.SQL("COMMENT ON DATABASE {} IS {}").format(
+            sql.Identifier(name), sql.Literal(f'{FIXTURE_TAG} {json.dumps(scale)}')))
+    conn.close()
+
+def insert_batched(conn, label, total, batch_size, statement, params):
+    """Run an INSERT ... generate_series(%(lo)s, %(hi)s) statement over rows 1..total in batches"""
+    started = time.monotonic()
+    cur = conn.cursor()
+    for lo in range(1, total + 1, batch_size):
+        hi = min(lo + batch_size - 1, total)
+        cur.execute(statement, dict(params, lo=lo, hi=hi))
+        conn.commit()
+        rate = hi / max(time.monotonic() - started, 1e-9)
+        print(f"  {label}: {hi:,}/{total:,} rows ({rate:,.0f} rows/sec)", flush=True)
+    cur.close()
+
+def recent_quarters(count):
+    """(year, quarter) for the last `count` quarters including the current one, oldest first"""
+    today = date.today()
+    year, quarter = today.year, (today.month - 1) // 3 + 1
+    quarters = []
+    for _ in range(count):
+        quarters.append((year, quarter))
+        year, quarter = (year, quarter - 1) if quarter > 1 else (year - 1, 4)
+    return quarters[::-1]
+
+def create_tools(conn, args):
+    cur = conn.cursor()
+    cur.execute("CREATE SCHEMA mes")
+    cur.execute("CREATE TABLE mes.gt_tool_family (family_id INTEGER PRIMARY KEY, family_name TEXT NOT NULL)")
+    cur.execute("""
+        INSERT INTO mes.gt_tool_family
+        SELECT ordinality, family FROM unnest(%s::text[]) WITH ORDINALITY AS f(family)
+    """, (TOOL_FAMILIES,))
+    cur.execute("""
+        CREATE TABLE mes.gt_tools (
+            tool_id INTEGER PRIMARY KEY,
+            tool_name TEXT NOT NULL,
+            tool_family_id INTEGER NOT NULL REFERENCES mes.gt_tool_family (family_id),
+            cluster_tool CHAR(1),
+            support_tool CHAR(1)
+        )
+    """)
+    # Names are family prefix + number (VIS104); OTHER tools get lower-case names, which the
+    # tool catalog skips like the support equipment it stands in for
+    cur.execute("""
+        INSERT INTO mes.gt_tools
+        SELECT g,
+               CASE WHEN f.family_name = 'OTHER' THEN 'oth' ELSE f.family_name END || (100 + g),
+               f.family_id,
+               CASE WHEN g %% 3 = 0 THEN 'T' ELSE 'F' END,
+               CASE WHEN g %% 5 = 0 THEN 'T' ELSE 'F' END
+        FROM generate_series(1, %s) g
+        JOIN mes.gt_tool_family f ON f.family_id = 1 + (g - 1) %% %s
+    """, (args.tools, len(TOOL_FAMILIES)))
+    conn.commit()
+    cur.close()
+
+def create_process_runs(conn, args):
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE mes.gt_process_runs (
+            run_id BIGINT PRIMARY KEY,
+            tool_id INTEGER,
+            recipe TEXT,
+            quantity INTEGER,
+            product TEXT,
+            prc_start_dt TIMESTAMP,
+            prc_completion_dt TIMESTAMP
+        )
+    """)
+    conn.commit()
+    cur.close()
+
+    recipes = [f'{RECIPE_PREFIXES[i % len(RECIPE_PREFIXES)]}-{i // len(RECIPE_PREFIXES) + 1:02d}'
+               for i in range(args.recipes)]
+    # Run ids follow completion time and each tool runs a fixed subset of the recipes.
+    # About 1% of runs have no start time and 1% report zero wafers.
+    insert_batched(conn, 'mes.gt_process_runs', args.runs, args.batch_size, """
+        INSERT INTO mes.gt_process_runs
+        SELECT g, tool_id,
+               (%(recipes)s::text[])[1 + (tool_id * 7 + floor(random() * %(recipes_per_tool)s)::int) %% %(recipe_count)s],
+               CASE WHEN random() < 0.01 THEN 0 ELSE 1 + floor(random() * 25)::int END,
+               'PRD-' || lpad(floor(random() * %(products)s)::text, 4, '0'),
+               CASE WHEN random() < 0.01 THEN NULL ELSE completion - duration END,
+               completion
+        FROM (
+            SELECT g,
+                   1 + floor(random() * %(tools)s)::int as tool_id,
+                   %(origin)s::timestamp + ((g - 1 + random()) * %(step)s) * INTERVAL '1 second' as completion,
+                   (0.5 + random() * 7.5) * INTERVAL '1 hour' as duration
+            FROM generate_series(%(lo)s, %(hi)s) g
+        ) runs
+    """, {
+        'recipes': recipes,
+        'recipes_per_tool': RECIPES_PER_TOOL,
+        'recipe_count': len(recipes),
+        'products': args.products,
+        'tools': args.tools,
+        'origin': datetime.now().replace(microsecond=0) - timedelta(days=args.days),
+        # Leave the last few minutes empty, like the settle window of a live MES
+        'step': (args.days * 86400 - 600) / max(args.runs, 1),
+    })
+    cur = conn.cursor()
+    print("  indexing mes.gt_process_runs", flush=True)
+    cur.execute("CREATE INDEX gt_process_runs_completion_idx ON mes.gt_process_runs (prc_completion_dt, run_id)")
+    cur.execute("CREATE INDEX gt_process_runs_tool_idx ON mes.gt_process_runs (tool_id)")
+    conn.commit()
+    cur.close()
+
+def create_wafers(conn, args):
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE mes.gt_wafers (
+            wafer_id BIGINT PRIMARY KEY,
+            lot_id TEXT,
+            product TEXT,
+            created_dt TIMESTAMP
+        )
+    """)
+    conn.commit()
+    cur.close()
+    insert_batched(conn, 'mes.gt_wafers', args.wafers, args.batch_size, """
+        INSERT INTO mes.gt_wafers
+        SELECT g, 'LOT' || lpad((g / 25)::text, 8, '0'),
+               'PRD-' || lpad(floor(random() * %(products)s)::text, 4, '0'),
+               LOCALTIMESTAMP - random() * %(days)s * INTERVAL '1 day'
+        FROM generate_series(%(lo)s, %(hi)s) g
+    """, {'products': args.products, 'days': args.days})
+
+def create_spc_partitions(conn, args):
+    events = [name for name, _, _ in SPC_EVENTS]
+    means = [mean for _, mean, _ in SPC_EVENTS]
+    spreads = [spread for _, _, spread in SPC_EVENTS]
+    for year, quarter in recent_quarters(args.spc_quarters):
+        table = f'gt_spc_det_{quarter}q_{year}'
+        quarter_start = datetime(year, 3 * quarter - 2, 1)
+        quarter_end = datetime(year + 1, 1, 1) if quarter == 4 else datetime(year, 3 * quarter + 1, 1)
+        # The current quarter only has measurements up to now
+        span = (min(quarter_end, datetime.now()) - quarter_start).total_seconds()
+        cur = conn.cursor()
+        cur.execute(sql.SQL("""
+            CREATE TABLE mes.{} (
+                spc_id BIGINT PRIMARY KEY,
+                wafer_id BIGINT,
+                event_name TEXT,
+                value DOUBLE PRECISION,
+                meas_dt TIMESTAMP
+            )
+        """).format(sql.Identifier(table)))
+        conn.commit()
+        cur.close()
+        # Values are roughly normal (sum of three uniforms) around each event's mean
+        insert_batched(conn, f'mes.{table}', args.spc_rows, args.batch_size, sql.SQL("""
+            INSERT INTO mes.{}
+            SELECT g, 1 + floor(random() * %(wafers)s)::bigint, (%(events)s::text[])[e],
+                   (%(means)s::float8[])[e] + (%(spreads)s::float8[])[e] * (random() + random() + random() - 1.5),
+                   %(start)s::timestamp + ((g - 1 + random()) * %(step)s) * INTERVAL '1 second'
+            FROM (SELECT g, 1 + g %% %(event_count)s as e FROM generate_series(%(lo)s, %(hi)s) g) measurements
+        """).format(sql.Identifier(table)), {
+            'wafers': max(args.wafers, 1), 'events': events, 'means': means, 'spreads': spreads,
+            'event_count': len(events), 'start': quarter_start, 'step': span / max(args.spc_rows, 1),
+        })
+        cur = conn.cursor()
+        cur.execute(sql.SQL("CREATE INDEX ON mes.{} (meas_dt)").format(sql.Identifier(table)))
+        conn.commit()
+        cur.close()
+
+def create_schedule_entries(conn, args):
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE schedule_entries (
+            id SERIAL PRIMARY KEY,
+            reactor_id TEXT,
+            date DATE,
+            shift TEXT,
+            product_id TEXT,
+            product_name TEXT,
+            customer TEXT,
+            theoretical_throughput NUMERIC,
+            plan_quantity NUMERIC,
+            ship_quantity NUMERIC,
+            reactor_type TEXT,
+            chamber_type TEXT,
+            pocket_count INTEGER,
+            avg_pocket_yield NUMERIC,
+            process_type TEXT,
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    conn.commit()
+    cur.close()
+    # Entries for catalog tools over the history plus two weeks ahead
+    insert_batched(conn, 'schedule_entries', args.schedule_entries, args.batch_size, """
+        INSERT INTO schedule_entries (reactor_id, date, shift, product_id, product_name, customer,
+            theoretical_throughput, plan_quantity, ship_quantity, reactor_type, chamber_type,
+            pocket_count, avg_pocket_yield, process_type)
+        SELECT t.tool_name,
+               CURRENT_DATE + 14 - floor(random() * (%(days)s + 14))::int,
+               CASE WHEN random() < 0.5 THEN 'Day' ELSE 'Night' END,
+               'PRD-' || lpad(p::text, 4, '0'), 'Product ' || p, 'Customer ' || (p %% 12),
+               400 + floor(random() * 300), 300 + floor(random() * 400), 250 + floor(random() * 300),
+               CASE WHEN f.family_name = 'SYS' THEN 'SYCR' ELSE f.family_name END,
+               CASE WHEN t.cluster_tool = 'T' THEN 'Multi-Chamber' ELSE '2-Chamber' END,
+               4 + floor(random() * 8)::int, 80 + random() * 19,
+               (%(product_types)s::text[])[1 + p %% %(product_type_count)s]
+        FROM (
+            SELECT g, floor(random() * %(products)s)::int as p,
+                   1 + floor(random() * %(tools)s)::int as tool_id
+            FROM generate_series(%(lo)s, %(hi)s) g
+        ) entries
+        JOIN mes.gt_tools t ON t.tool_id = entries.tool_id
+        JOIN mes.gt_tool_family f ON f.family_id = t.tool_family_id
+    """, {
+        'days': args.days, 'products': args.products, 'tools': args.tools,
+        'product_types': PRODUCT_TYPES, 'product_type_count': len(PRODUCT_TYPES),
+    })
+    cur = conn.cursor()
+    cur.execute("CREATE INDEX schedule_entries_date_idx ON schedule_entries (date, id)")
+    conn.commit()
+    cur.close()
+
+def main():
+    args = parse_args()
+    scale = {name: getattr(args, name) for name in
+             ('runs', 'tools', 'recipes', 'products', 'days', 'wafers', 'spc_quarters', 'spc_rows',
+              'schedule_entries', 'seed')}
+    scale['generated_at'] = datetime.now().isoformat(timespec='seconds')
+    started = time.monotonic()
+
+    create_databases(args, [args.production_db, args.staging_db], scale)
+    print(f"Generating {args.production_db} ({args.runs:,} runs, {args.tools} tools)")
+    conn = connect(args, args.production_db)
+    cur = conn.cursor()
+    cur.execute("SELECT setseed(%s)", (args.seed,))
+    cur.close()
+    create_tools(conn, args)
+    create_process_runs(conn, args)
+    create_wafers(conn, args)
+    create_spc_partitions(conn, args)
+    create_schedule_entries(conn, args)
+
+    print("  analyzing", flush=True)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("VACUUM ANALYZE")
+    cur.close()
+    conn.close()
+    print(f"Fixture ready in {time.monotonic() - started:.1f}s: "
+          f"production={args.production_db} staging={args.staging_db}")
+
+if __name__ == '__main__':
+    main()
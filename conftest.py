@@ -0,0 +1,4 @@
+# Unit tests import app.py directly and need no database or running server; test_cluster.py
+# runs against a scratch staging database when TEST_STAGING_DB_HOST is set and skips otherwise.
+# These two scripts exercise a live server on localhost:5000 and are run by hand.
+collect_ignore = ['test_predictive_validation.py', 'test_production_migration.py']
@@ -0,0 +1,60 @@
+# Gunicorn configuration for the Small Batch Reactor Scheduling System
+#
+# The app is imported once in the master (preload_app), which loads the tool catalog and
+# then forks the workers straight away; they share those pages copy-on-write. The heavy
+# caches (rollup, run snapshot, SPC stats) are built in the background after the fork by the
+# worker that owns the refreshers, so workers answer requests within seconds of a start.
+# Started by start_reactor_app.sh:
+#
+#     gunicorn -c gunicorn.conf.py app:app
+#
+# Signals to the master: TERM/INT stop (TERM waits for in-flight requests), HUP re-forks
+# workers from the already-loaded master, USR2 starts a new master with fresh code.
+#
+# Workers coordinate through the staging database (app.ClusterCoordinator): one of them owns
+# the shared background refreshers and the others follow its results, and cache
+# invalidations and stream events published in one worker reach all of them.
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_WORKERS', '4'))
+# Threads per worker. Each open /api/stream event stream holds one for its lifetime, so a
+# worker accepts at most EVENT_STREAM_MAX_CONNECTIONS streams (default half its threads) and
+# further dashboards poll /api/status instead. The server as a whole keeps
+# workers x EVENT_STREAM_MAX_CONNECTIONS dashboards live (16 with the 4 x 8 default); raise
+# WEB_THREADS, or set the cap, at deploy time for more viewers.
+threads = int(os.getenv('WEB_THREADS', '8'))
+stream_limit = int(os.getenv('EVENT_STREAM_MAX_CONNECTIONS') or max(1, threads // 2))
+if not 0 < stream_limit < threads:
+    # 0 (no limit) or a cap at the thread count lets streams starve ordinary requests
+    raise ValueError(f"EVENT_STREAM_MAX_CONNECTIONS must be between 1 and WEB_THREADS - 1 "
+                     f"({threads - 1}), got {stream_limit}")
+os.environ['EVENT_STREAM_MAX_CONNECTIONS'] = str(stream_limit)
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+# Recycle workers now and then so per-worker caches and heap growth stay bounded
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+pidfile = os.getenv('PID_FILE', '/tmp/reactor_scheduling_app.pid')
+accesslog = os.getenv('ACCESS_LOG') or None
+errorlog = '-'
+proc_name = 'reactor_scheduling_app'
+
+def when_ready(server):
+    import app
+    server.log.info("Event streams: %d per worker, %d live dashboards in total",
+                    stream_limit, stream_limit * workers)
+    server.log.info("Loading the tool catalog before forking workers")
+    app.preload_shared_state()
+
+def post_fork(server, worker):
+    import app
+    app.reset_after_fork()
+
+def worker_exit(server, worker):
+    import app
+    app.cluster.stop()
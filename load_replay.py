@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Replay the dashboard's traffic mix from N concurrent simulated users
+
+Each client behaves like templates/index.html: it loads the page and the /api/dashboard
+bootstrap, holds the /api/stream event stream open (polling /api/status instead while the
+server refuses it), and switches sections every few seconds (exponential think time),
+fetching what each section's loader fetches. --status-poll adds the per-second /api/status
+polling of the pre-stream page.
+
+By default the app is served in-process by a threaded werkzeug server on the fixture
+databases from benchmark_fixture.py; --base-url targets a running server (e.g. gunicorn)
+instead. Reports p50/p95/p99 latency per route, request throughput and database pool usage
+sampled from /api/admin/db-pool, and writes them to benchmark_results/load/.
+
+Each pool sample describes only the worker process that answered it (a gunicorn server has
+one pool per worker), so samples are grouped by worker pid: peaks and means are per worker,
+acquisitions are summed over the workers that were sampled more than once.
+
+    python3 load_replay.py --db-host /tmp/pgdata --db-user postgres --clients 50 --duration 120
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from datetime import datetime
+
+from benchmark_endpoints import RESULTS_DIR, configure_environment, git_revision, percentile, prime_caches
+
+# Section switches: (section, relative frequency, requests its loader makes)
+SECTION_MIX = [
+    ('ai-analysis', 4, ['/api/ai-analysis/full-performance']),
+    ('predictive-modeling', 4, ['/api/predictive-scheduling']),
+    ('yield-optimization', 2, ['/api/ai-analysis/full-performance']),
+    ('reactors', 2, ['/api/reactors']),
+    ('schedule', 2, ['/api/schedule']),
+    ('production-analytics', 2, ['/api/production-stats']),
+    ('post-run-analysis', 1, ['/api/historical-runs']),
+    ('historical-trends', 1, ['/api/historical-runs']),
+    ('processes', 1, ['/api/processes']),
+    ('system', 1, ['/api/status']),
+]
+BOOTSTRAP_REQUESTS = ['/', '/api/dashboard']
+STREAM_PATH = '/api/stream'
+# A page refused a stream (503, the worker is at EVENT_STREAM_MAX_CONNECTIONS) polls
+# /api/status this often and asks for a stream again after the response's Retry-After
+STREAM_FALLBACK_POLL = 10
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Replay concurrent dashboard traffic')
+    parser.add_argument('--clients', type=int, default=20, help='simultaneous dashboard users')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of load after ramp-up starts')
+    parser.add_argument('--ramp-up', type=float, default=10, help='seconds over which clients arrive')
+    parser.add_argument('--think-time', type=float, default=5, help='mean seconds between section switches')
+    parser.add_argument('--status-poll', type=float, default=0, help='poll /api/status every N seconds (0: off)')
+    parser.add_argument('--no-stream', action='store_true', help='do not hold /api/stream open')
+    parser.add_argument('--sample-interval', type=float, default=1.0, help='seconds between db-pool samples')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--base-url', help='load a running server instead of serving the app in-process')
+    parser.add_argument('--db-host', default='localhost', help='fixture server host or unix socket directory')
+    parser.add_argument('--db-port', default='5432')
+    parser.add_argument('--db-user', default='postgres')
+    parser.add_argument('--production-db', default='mesprod_bench')
+    parser.add_argument('--staging-db', default='reactor_scheduling_bench')
+    parser.add_argument('--snapshot-dir', help='run snapshot directory (default: a fresh temporary directory)')
+    parser.add_argument('--no-prime', action='store_true', help='do not build the background caches before the run')
+    parser.add_argument('--output', help='result file (default: benchmark_results/load/<timestamp>-<commit>.json)')
+    return parser.parse_args()
+
+class LoadStats:
+    """Latencies and failures per route, shared by every client thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.stream_events = 0
+        self.streams_opened = 0
+        self.streams_refused = 0
+
+    def record(self, route, latency_ms, ok):
+        with self._lock:
+            self.latencies[route].append(latency_ms)
+            if not ok:
+                self.errors[route] += 1
+
+    def add_stream_events(self, count, opened=0, refused=0):
+        with self._lock:
+            self.stream_events += count
+            self.streams_opened += opened
+            self.streams_refused += refused
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2),
+    }
+
+def request(conn, path, stats):
+    """GET path on a keep-alive connection, recording latency; reconnects once on a dropped connection"""
+    started = time.perf_counter()
+    for attempt in range(2):
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            stats.record(path.split('?')[0], (time.perf_counter() - started) * 1000, response.status < 400)
+            return
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if attempt:
+                stats.record(path.split('?')[0], (time.perf_counter() - started) * 1000, False)
+
+def hold_stream(host, port, deadline, stats):
+    """Keep the event stream open until the deadline, counting the events received
+
+    A refused stream falls back to polling /api/status until its Retry-After has passed,
+    then asks again, like the page does.
+    """
+    while time.monotonic() < deadline:
+        # Status ticks arrive every second while subscribed, so a blocking read returns promptly
+        # after the deadline; the timeout only bounds a stalled stream (keepalives are 15s apart)
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        try:
+            conn.request('GET', STREAM_PATH, headers={'Accept': 'text/event-stream'})
+            response = conn.getresponse()
+            if response.status != 200:
+                response.read()
+                stats.add_stream_events(0, refused=1)
+                retry_at = time.monotonic() + float(response.getheader('Retry-After') or 60)
+                while time.monotonic() < min(retry_at, deadline):
+                    request(conn, '/api/status', stats)
+                    time.sleep(max(0.0, min(STREAM_FALLBACK_POLL, retry_at - time.monotonic(),
+                                            deadline - time.monotonic())))
+                continue
+            stats.add_stream_events(0, opened=1)
+            while time.monotonic() < deadline:
+                line = response.fp.readline()
+                if not line:
+                    break
+                if line.startswith(b'event:'):
+                    stats.add_stream_events(1)
+            return
+        except (http.client.HTTPException, OSError):
+            return
+        finally:
+            conn.close()
+
+def run_client(host, port, start_at, deadline, args, stats, rng):
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    for path in BOOTSTRAP_REQUESTS:
+        request(conn, path, stats)
+    stream = None
+    if not args.no_stream:
+        stream = threading.Thread(target=hold_stream, args=(host, port, deadline, stats), daemon=True)
+        stream.start()
+
+    sections = [fetches for _, _, fetches in SECTION_MIX]
+    weights = [weight for _, weight, _ in SECTION_MIX]
+    now = time.monotonic()
+    next_switch = now + rng.expovariate(1 / args.think_time)
+    next_poll = now + args.status_poll if args.status_poll else float('inf')
+    while now < deadline:
+        if now >= next_poll:
+            request(conn, '/api/status', stats)
+            next_poll += args.status_poll
+        if now >= next_switch:
+            for path in rng.choices(sections, weights)[0]:
+                request(conn, path, stats)
+            next_switch = time.monotonic() + rng.expovariate(1 / args.think_time)
+        now = time.monotonic()
+        time.sleep(max(0.0, min(next_switch, next_poll, deadline) - now))
+        now = time.monotonic()
+    conn.close()
+    if stream is not None:
+        stream.join()
+
+def sample_pools(host, port, deadline, interval, samples):
+    """Record /api/admin/db-pool every `interval` seconds until the deadline"""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while time.monotonic() < deadline:
+        try:
+            conn.request('GET', '/api/admin/db-pool')
+            samples.append(json.loads(conn.getresponse().read()))
+        except (http.client.HTTPException, OSError, ValueError):
+            conn.close()
+        time.sleep(interval)
+    conn.close()
+
+def summarize_pools(samples):
+    """Peak and mean connections in use per pool and worker, with acquisition counts over the run"""
+    pools = defaultdict(lambda: defaultdict(list))  # pool name -> worker pid -> samples
+    for sample in samples:
+        for pool in sample.get('pools', []):
+            pools[pool['name']][sample.get('pid')].append(pool)
+    summary = {}
+    for name, workers in pools.items():
+        per_worker = {}
+        for pid, history in workers.items():
+            in_use = [pool['in_use'] for pool in history]
+            per_worker[str(pid)] = {
+                'samples': len(history),
+                'peak_in_use': max(in_use),
+                'mean_in_use': round(sum(in_use) / len(in_use), 2),
+                'saturated_samples': sum(1 for value in in_use if value >= history[-1]['max_connections']),
+                'acquisitions': history[-1]['acquisitions'] - history[0]['acquisitions'],
+                'avg_acquire_wait_ms': history[-1]['avg_acquire_wait_ms'],
+            }
+        all_in_use = [pool['in_use'] for history in workers.values() for pool in history]
+        summary[name] = {
+            'workers_sampled': len(workers),
+            'max_connections': next(iter(workers.values()))[-1]['max_connections'],
+            'peak_in_use': max(all_in_use),
+            'mean_in_use': round(sum(all_in_use) / len(all_in_use), 2),
+            'saturated_samples': sum(worker['saturated_samples'] for worker in per_worker.values()),
+            'acquisitions': sum(worker['acquisitions'] for worker in per_worker.values()),
+            'worst_avg_acquire_wait_ms': max(worker['avg_acquire_wait_ms'] for worker in per_worker.values()),
+            'workers': per_worker,
+        }
+    return summary
+
+def start_local_server(args):
+    """Serve the app on an ephemeral port from a threaded werkzeug server; returns (host, port)"""
+    configure_environment(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    from werkzeug.serving import make_server
+
+    priming = {}
+    if not args.no_prime:
+        print("Priming background caches")
+        priming = prime_caches(app_module)
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-replay-server', daemon=True).start()
+    return '127.0.0.1', server.server_port, priming
+
+def main():
+    args = parse_args()
+    if args.base_url:
+        url = urllib.parse.urlsplit(args.base_url)
+        host, port, priming = url.hostname, url.port or 80, {}
+    else:
+        host, port, priming = start_local_server(args)
+
+    stats = LoadStats()
+    pool_samples = []
+    rng = random.Random(args.seed)
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=sample_pools, args=(host, port, deadline, args.sample_interval, pool_samples),
+                                daemon=True)]
+    for client in range(args.clients):
+        start_at = started + args.ramp_up * client / max(args.clients, 1)
+        threads.append(threading.Thread(target=run_client, name=f'client-{client}', daemon=True,
+                                        args=(host, port, start_at, deadline, args, stats, random.Random(rng.random()))))
+    print(f"Replaying {args.clients} clients against {host}:{port} for {args.duration:.0f}s")
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    all_latencies = [latency for latencies in stats.latencies.values() for latency in latencies]
+    total_errors = sum(stats.errors.values())
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'target': args.base_url or 'in-process',
+        'clients': args.clients,
+        'duration_seconds': round(elapsed, 1),
+        'think_time_seconds': args.think_time,
+        'status_poll_seconds': args.status_poll,
+        'priming': priming,
+        'overall': dict(summarize(all_latencies) if all_latencies else {'requests': 0},
+                        errors=total_errors, throughput_rps=round(len(all_latencies) / elapsed, 1)),
+        'routes': {route: dict(summarize(latencies), errors=stats.errors[route])
+                   for route, latencies in sorted(stats.latencies.items())},
+        'streams': {'opened': stats.streams_opened, 'refused': stats.streams_refused, 'events': stats.stream_events},
+        'db_pools': summarize_pools(pool_samples),
+    }
+
+    print(f"\n{'route':40} {'requests':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, summary in results['routes'].items():
+        print(f"{route:40} {summary['requests']:>9,} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+              f"{summary['p99_ms']:>9.1f} {summary['errors']:>7}")
+    overall = results['overall']
+    if all_latencies:
+        print(f"{'all':40} {overall['requests']:>9,} {overall['p50_ms']:>9.1f} {overall['p95_ms']:>9.1f} "
+              f"{overall['p99_ms']:>9.1f} {overall['errors']:>7}")
+    print(f"\nThroughput: {overall['throughput_rps']} requests/sec; "
+          f"event streams: {stats.streams_opened} opened, {stats.streams_refused} refused, {stats.stream_events} events")
+    for name, pool in results['db_pools'].items():
+        print(f"Pool {name} ({pool['workers_sampled']} worker(s) sampled): "
+              f"peak {pool['peak_in_use']}/{pool['max_connections']} in use per worker, "
+              f"mean {pool['mean_in_use']}, {pool['acquisitions']:,} acquisitions, "
+              f"worst avg wait {pool['worst_avg_acquire_wait_ms']} ms, saturated in {pool['saturated_samples']} samples")
+
+    output = args.output or os.path.join(RESULTS_DIR, 'load', f"{datetime.now():%Y%m%d-%H%M%S}-{results['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
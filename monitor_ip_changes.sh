@@ -32,6 +32,7 @@ IP_CHECK_INTERVAL=60  # Check every 60 seconds
 LOG_FILE="/home/dbadmin/logs/ip_monitor.log"
 RESTART_ON_CHANGE=false
 NOTIFY_ON_CHANGE=true
+APP_URL="${APP_URL:-http://127.0.0.1:${PORT:-5000}}"
 
 # Function to log with timestamp
 log_message() {
@@ -82,6 +83,17 @@ handle_ip_change() {
         echo "IP_CHANGE_EVENT: $(date '+%Y-%m-%d %H:%M:%S') - $old_ip -> $new_ip" >> /tmp/reactor_ip_changes.log
     fi
     
+    # Tell the running application to re-resolve its network snapshot (the worker that takes
+    # the request passes it on to the others)
+    if [ "$RESTART_ON_CHANGE" != true ]; then
+        if curl -s -f -m 15 -X POST "$APP_URL/api/admin/network/refresh" > /dev/null 2>&1; then
+            print_status "Application network info refreshed"
+            log_message "Application network info refreshed via $APP_URL"
+        else
+            print_warning "Could not signal application at $APP_URL (it will pick up the change on its next refresh)"
+        fi
+    fi
+    
     if [ "$RESTART_ON_CHANGE" = true ]; then
         print_status "Restarting application due to IP change..."
         if [ -f "./restart_reactor_app.sh" ]; then
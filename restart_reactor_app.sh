@@ -2,12 +2,25 @@
 
 # Small Batch Reactor Scheduling System - Restart Script
 # This script restarts the Flask application by stopping and starting it
+#
+# Under gunicorn the application can also be restarted without dropping requests:
+#   --reload    re-fork the workers from the running master (HUP); picks up worker settings,
+#               not code changes, since the code is preloaded in the master
+#   --graceful  start a new master with fresh code (USR2), wait until its workers answer
+#               /api/ready, then stop the old one; if it is not ready within STARTUP_WAIT
+#               seconds it is stopped instead and the old master keeps serving
 
 # Configuration
 SCRIPT_DIR="/home/dbadmin"
 START_SCRIPT="$SCRIPT_DIR/start_reactor_app.sh"
 STOP_SCRIPT="$SCRIPT_DIR/stop_reactor_app.sh"
 STATUS_SCRIPT="$SCRIPT_DIR/status_reactor_app.sh"
+APP_NAME="reactor_scheduling_app"
+PID_FILE="/tmp/${APP_NAME}.pid"
+PORT=${PORT:-5000}
+STARTUP_WAIT=${STARTUP_WAIT:-120}
+GRACEFUL_TIMEOUT=${WEB_GRACEFUL_TIMEOUT:-30}
+MODE="${1:-}"
 
 # Colors for output
 RED='\033[0;31m'
@@ -33,12 +46,94 @@ print_header() {
     echo -e "${BLUE}[RESTART]${NC} $1"
 }
 
+# True once a worker of master $1 answers the readiness probe; while two masters share the
+# port either one's workers may answer, so probe a few times
+master_ready() {
+    for attempt in 1 2 3 4 5; do
+        if curl -sf --max-time 5 http://localhost:$PORT/api/ready 2>/dev/null | grep -Eq "\"master_pid\": *$1[,}]"; then
+            return 0
+        fi
+    done
+    return 1
+}
+
 # Header
 echo "=================================================="
 print_header "Small Batch Reactor Scheduling System Restart"
 echo "=================================================="
 echo ""
 
+# Hot reload of a running gunicorn master
+if [ "$MODE" = "--reload" ] || [ "$MODE" = "--graceful" ]; then
+    PID=$(cat "$PID_FILE" 2>/dev/null)
+    if [ -z "$PID" ] || ! ps -p $PID -o cmd --no-headers 2>/dev/null | grep -q gunicorn; then
+        print_error "No running gunicorn master found (PID file: $PID_FILE)"
+        print_error "Run without $MODE to stop and start the application"
+        exit 1
+    fi
+
+    if [ "$MODE" = "--reload" ]; then
+        print_header "Re-forking workers of master $PID..."
+        kill -HUP $PID
+        print_status "✓ Workers are being replaced as they finish their current requests"
+        exit 0
+    fi
+
+    # USR2 renames the PID file to .oldbin and forks a new master (with GUNICORN_PID of the old
+    # one in its environment), which loads the tool catalog and forks its workers; the old
+    # master keeps serving until the new one is ready
+    print_header "Starting a new master alongside $PID..."
+    kill -USR2 $PID
+    NEW_PID=""
+    READY=0
+    for ((i = 0; i < STARTUP_WAIT; i += 2)); do
+        sleep 2
+        if [ -z "$NEW_PID" ]; then
+            for CHILD in $(pgrep -P $PID); do
+                if tr '\0' '\n' < /proc/$CHILD/environ 2>/dev/null | grep -qx "GUNICORN_PID=$PID"; then
+                    NEW_PID=$CHILD
+                    print_status "New master $NEW_PID is starting its workers..."
+                fi
+            done
+        elif ! ps -p $NEW_PID > /dev/null 2>&1; then
+            break
+        elif master_ready $NEW_PID; then
+            READY=1
+            break
+        fi
+    done
+
+    if [ $READY -eq 0 ]; then
+        if [ -z "$NEW_PID" ]; then
+            print_error "✗ No new master was started"
+        elif ps -p $NEW_PID > /dev/null 2>&1; then
+            print_error "✗ New master $NEW_PID was not ready within ${STARTUP_WAIT}s; stopping it"
+            kill -TERM $NEW_PID
+            for ((i = 0; i < GRACEFUL_TIMEOUT + 5; i++)); do
+                ps -p $NEW_PID > /dev/null 2>&1 || break
+                sleep 1
+            done
+            if ps -p $NEW_PID > /dev/null 2>&1; then
+                pkill -KILL -P $NEW_PID
+                kill -KILL $NEW_PID
+            fi
+        else
+            print_error "✗ New master $NEW_PID exited before it was ready"
+        fi
+        # The old master does not take its PID file back on its own
+        if [ -f "$PID_FILE.oldbin" ]; then
+            cp "$PID_FILE.oldbin" "$PID_FILE"
+        fi
+        print_error "The old master $PID is still serving; check the error log"
+        exit 1
+    fi
+
+    print_status "New master $NEW_PID is serving; stopping old master $PID"
+    kill -TERM $PID
+    print_status "✓ Graceful restart completed"
+    exit 0
+fi
+
 # Check if required scripts exist
 if [ ! -f "$START_SCRIPT" ]; then
     print_error "Start script not found: $START_SCRIPT"
@@ -12,6 +12,16 @@ PID_FILE="/tmp/${APP_NAME}.pid"
 LOG_FILE="/home/dbadmin/logs/${APP_NAME}.log"
 ERROR_LOG="/home/dbadmin/logs/${APP_NAME}_error.log"
 PORT=${PORT:-5000}  # Default Flask port; can be overridden by environment
+# gunicorn: pre-fork workers sharing the preloaded tool catalog (gunicorn.conf.py); flask: single dev server
+SERVER_MODE=${SERVER_MODE:-gunicorn}
+WEB_WORKERS=${WEB_WORKERS:-4}
+WEB_THREADS=${WEB_THREADS:-8}
+# Live /api/stream dashboards per worker; each holds a thread, so keep it below WEB_THREADS.
+# The server serves WEB_WORKERS x this many live dashboards; further ones poll every 10s.
+EVENT_STREAM_MAX_CONNECTIONS=${EVENT_STREAM_MAX_CONNECTIONS:-$((WEB_THREADS / 2))}
+# Seconds to wait for /api/ready. Workers serve as soon as they are forked; the rollup, run
+# snapshot and SPC caches fill in afterwards in the background
+STARTUP_WAIT=${STARTUP_WAIT:-120}
 
 # Colors for output
 RED='\033[0;31m'
@@ -125,22 +135,52 @@ fi
 source "$VENV_PATH/bin/activate"
 
 # Install required packages if not present
-pip install flask psycopg2-binary > /dev/null 2>&1
+pip install flask psycopg2-binary gunicorn > /dev/null 2>&1
 
-# Start the Flask application
-export PORT
-nohup python "$APP_FILE" > "$LOG_FILE" 2> "$ERROR_LOG" &
-APP_PID=$!
+if [ "$SERVER_MODE" = "gunicorn" ] && ! command -v gunicorn > /dev/null 2>&1; then
+    print_warning "gunicorn is not available; falling back to the Flask server"
+    SERVER_MODE="flask"
+fi
 
-# Save PID to file
+export PORT PID_FILE WEB_WORKERS WEB_THREADS EVENT_STREAM_MAX_CONNECTIONS
+if [ "$SERVER_MODE" = "gunicorn" ]; then
+    # The master loads the tool catalog before forking; it rewrites the same PID file then
+    print_status "Starting gunicorn: $WEB_WORKERS workers x $WEB_THREADS threads"
+    print_status "Live event streams: $((WEB_WORKERS * EVENT_STREAM_MAX_CONNECTIONS)) ($EVENT_STREAM_MAX_CONNECTIONS per worker)"
+    nohup gunicorn -c gunicorn.conf.py app:app > "$LOG_FILE" 2> "$ERROR_LOG" &
+    APP_PID=$!
+else
+    # Start the Flask application
+    nohup python "$APP_FILE" > "$LOG_FILE" 2> "$ERROR_LOG" &
+    APP_PID=$!
+fi
 echo $APP_PID > "$PID_FILE"
 
-# Wait a moment and check if the application started successfully
-sleep 3
+# Wait until the application answers its readiness probe (reporting this process as its master)
+print_status "Waiting up to ${STARTUP_WAIT}s for the application to become ready..."
+READY=0
+for ((i = 0; i < STARTUP_WAIT; i += 2)); do
+    if ! ps -p $APP_PID > /dev/null 2>&1; then
+        break
+    fi
+    if curl -sf --max-time 5 http://localhost:$PORT/api/ready 2>/dev/null | grep -Eq "\"master_pid\": *$APP_PID[,}]"; then
+        READY=1
+        break
+    fi
+    sleep 2
+done
 
-if ps -p $APP_PID > /dev/null 2>&1; then
+if [ $READY -eq 0 ] && ps -p $APP_PID > /dev/null 2>&1; then
+    print_error "Application (PID $APP_PID) is running but not ready after ${STARTUP_WAIT}s"
+    print_error "Check $LOG_FILE and $ERROR_LOG (e.g. an unreachable database), raise STARTUP_WAIT,"
+    print_error "or stop it with stop_reactor_app.sh"
+    exit 1
+fi
+
+if [ $READY -eq 1 ]; then
     print_status "Application started successfully!"
     print_status "PID: $APP_PID"
+    print_status "Server: $SERVER_MODE"
     print_status "Port: $PORT"
     print_status "Log file: $LOG_FILE"
     print_status "Error log: $ERROR_LOG"
@@ -165,15 +205,7 @@ if ps -p $APP_PID > /dev/null 2>&1; then
         print_status "External access: http://$SERVER_IP:$PORT"
         print_status "API endpoints: http://$SERVER_IP:$PORT/api/status"
     fi
-    
-    # Check if the application is responding
-    sleep 2
-    if curl -s http://localhost:$PORT/api/status > /dev/null 2>&1; then
-        print_status "Application is responding to HTTP requests"
-    else
-        print_warning "Application started but may not be responding to HTTP requests yet"
-        print_warning "Check the log files for more information"
-    fi
+    print_status "Application is responding to HTTP requests"
 else
     print_error "Failed to start application"
     print_error "Check error log: $ERROR_LOG"
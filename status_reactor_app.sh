@@ -8,7 +8,7 @@ APP_NAME="reactor_scheduling_app"
 PID_FILE="/tmp/${APP_NAME}.pid"
 LOG_FILE="/home/dbadmin/logs/${APP_NAME}.log"
 ERROR_LOG="/home/dbadmin/logs/${APP_NAME}_error.log"
-PORT=5000
+PORT=${PORT:-5000}
 
 # Colors for output
 RED='\033[0;31m'
@@ -55,6 +55,14 @@ if [ -f "$PID_FILE" ]; then
         MEMORY_KB=$(ps -p $PID -o rss --no-headers)
         MEMORY_MB=$((MEMORY_KB / 1024))
         echo "  Memory Usage: ${MEMORY_MB} MB"
+
+        # Gunicorn workers (they share the master's preloaded pages, so RSS overcounts)
+        WORKER_PIDS=$(pgrep -P $PID)
+        if [ -n "$WORKER_PIDS" ]; then
+            WORKER_COUNT=$(echo "$WORKER_PIDS" | wc -l)
+            WORKER_RSS_KB=$(ps -o rss= -p $(echo $WORKER_PIDS | tr ' ' ',') | awk '{sum += $1} END {print sum}')
+            echo "  Workers: $WORKER_COUNT (total RSS $((WORKER_RSS_KB / 1024)) MB)"
+        fi
         
     else
         print_error "✗ PID file exists but process is not running"
@@ -62,7 +70,7 @@ if [ -f "$PID_FILE" ]; then
     fi
 else
     # Check if Flask process is running without PID file
-    FLASK_PID=$(pgrep -f "python.*app.py")
+    FLASK_PID=$(pgrep -o -f "python.*app.py|gunicorn.*app:app")
     if [ -n "$FLASK_PID" ]; then
         print_warning "✓ Flask process found but no PID file (PID: $FLASK_PID)"
         print_warning "  This may indicate an unmanaged process"
@@ -7,6 +7,9 @@
 APP_NAME="reactor_scheduling_app"
 PID_FILE="/tmp/${APP_NAME}.pid"
 LOG_FILE="/home/dbadmin/logs/${APP_NAME}.log"
+# Covers gunicorn's graceful_timeout, during which workers finish in-flight requests
+STOP_TIMEOUT=${STOP_TIMEOUT:-40}
+APP_PATTERN="python.*app.py|gunicorn.*app:app"
 
 # Colors for output
 RED='\033[0;31m'
@@ -32,7 +35,7 @@ if [ ! -f "$PID_FILE" ]; then
     print_warning "PID file not found. Application may not be running."
     
     # Try to find the process anyway
-    FLASK_PID=$(pgrep -f "python.*app.py")
+    FLASK_PID=$(pgrep -o -f "$APP_PATTERN")
     if [ -n "$FLASK_PID" ]; then
         print_status "Found Flask process with PID: $FLASK_PID"
         print_status "Attempting to stop it..."
@@ -71,11 +74,11 @@ fi
 
 print_status "Stopping Small Batch Reactor Scheduling System (PID: $PID)..."
 
-# Try graceful shutdown first
+# Try graceful shutdown first (a gunicorn master stops its workers after their current requests)
 kill -TERM $PID
 
 # Wait for graceful shutdown
-TIMEOUT=10
+TIMEOUT=$STOP_TIMEOUT
 COUNTER=0
 
 while [ $COUNTER -lt $TIMEOUT ]; do
@@ -92,7 +95,8 @@ done
 echo ""
 print_warning "Graceful shutdown timed out. Forcing termination..."
 
-# Force kill if graceful shutdown failed
+# Force kill if graceful shutdown failed, including any gunicorn workers
+pkill -KILL -P $PID 2>/dev/null
 kill -KILL $PID
 sleep 2
 
@@ -106,7 +110,7 @@ else
 fi
 
 # Also clean up any other Flask processes that might be running
-OTHER_PIDS=$(pgrep -f "python.*app.py" | grep -v $PID)
+OTHER_PIDS=$(pgrep -f "$APP_PATTERN" | grep -v $PID)
 if [ -n "$OTHER_PIDS" ]; then
     print_status "Cleaning up other Flask processes..."
     echo $OTHER_PIDS | xargs kill -TERM
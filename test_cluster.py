@@ -0,0 +1,93 @@
+"""Refresher ownership and shared state between server processes
+
+These need a staging database: set TEST_STAGING_DB_HOST (and TEST_STAGING_DB_NAME,
+TEST_STAGING_DB_USER, TEST_STAGING_DB_PORT as needed), e.g. a scratch PostgreSQL socket
+directory. They are skipped otherwise.
+"""
+
+import json
+import os
+import time
+
+import psycopg2
+import pytest
+
+import app
+
+TEST_LOCK_ID = 0x54657374  # keeps a running server's owner out of the election under test
+
+
+@pytest.fixture
+def staging(monkeypatch):
+    host = os.getenv('TEST_STAGING_DB_HOST')
+    if not host:
+        pytest.skip('TEST_STAGING_DB_HOST is not set')
+    config = {'host': host,
+              'database': os.getenv('TEST_STAGING_DB_NAME', 'reactor_scheduling'),
+              'user': os.getenv('TEST_STAGING_DB_USER', 'dbadmin')}
+    if os.getenv('TEST_STAGING_DB_PORT'):
+        config['port'] = int(os.getenv('TEST_STAGING_DB_PORT'))
+    try:
+        psycopg2.connect(**config).close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f'staging database unavailable: {e}')
+    monkeypatch.setattr(app.staging_pool, 'config', config)
+    monkeypatch.setattr(app, '_rollup_schema_ready', False)
+    app.staging_pool.close_all()
+    yield config
+    app.staging_pool.close_all()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_shared_state_round_trip(staging):
+    app.save_shared_state('test-cluster', json.dumps({'value': 1}))
+    app.save_shared_state('test-cluster', json.dumps({'value': 2}))
+    body, age = app.load_shared_state('test-cluster')
+    assert json.loads(body) == {'value': 2}
+    assert 0 <= age < 60
+    assert app.load_shared_state('test-cluster-missing') == (None, None)
+
+
+def test_follower_loads_counts_shared_by_owner(staging, monkeypatch):
+    previous, _ = app.load_shared_state('exact_record_counts')
+    counts = {'gt_tools': {'count': 42, 'as_of': '2026-01-01T00:00:00'}}
+    app.save_shared_state('exact_record_counts', json.dumps(counts))
+    monkeypatch.setattr(app.cluster, 'is_owner', False)
+    monkeypatch.setattr(app, '_exact_record_counts', {})
+    try:
+        # A follower never counts; it only loads what the owner shared
+        app.exact_count_refresher.refresh_now()
+        assert app.exact_count_refresher.last_error is None
+        assert app._exact_record_counts == counts
+    finally:
+        if previous is not None:
+            app.save_shared_state('exact_record_counts', previous)
+
+
+def test_one_owner_at_a_time_and_takeover_when_it_leaves(staging, monkeypatch):
+    monkeypatch.setattr(app, 'CLUSTER_OWNER_LOCK_ID', TEST_LOCK_ID)
+    monkeypatch.setattr(app, 'CLUSTER_OWNER_RETRY_INTERVAL', 0.2)
+    monkeypatch.setattr(app, 'CLUSTER_RECONNECT_DELAY', 0.2)
+    monkeypatch.setattr(app.BackgroundRefresher, 'threads_enabled', False)
+    first, second = app.ClusterCoordinator(staging), app.ClusterCoordinator(staging)
+    try:
+        first.start()
+        assert wait_for(lambda: first.is_owner)
+        second.start()
+        time.sleep(1)
+        assert not second.is_owner
+
+        first.stop()
+        assert not first.is_owner
+        assert wait_for(lambda: second.is_owner)
+    finally:
+        first.stop()
+        second.stop()
@@ -0,0 +1,30 @@
+"""Keyset page cursor encoding (no database needed)"""
+
+from datetime import datetime
+
+import pytest
+
+import app
+
+
+def test_cursor_round_trip():
+    token = app.encode_page_cursor(datetime(2026, 3, 1, 7, 30, 15), 123456)
+    assert app.decode_page_cursor(token, 2) == ['2026-03-01T07:30:15', 123456]
+
+
+def test_cursor_is_url_safe_without_padding():
+    for run_id in range(1, 40):
+        token = app.encode_page_cursor('tool/recipe+?', run_id)
+        assert '=' not in token and '+' not in token and '/' not in token
+        assert app.decode_page_cursor(token, 2) == ['tool/recipe+?', run_id]
+
+
+def test_cursor_round_trips_null_keys():
+    token = app.encode_page_cursor(None, 7)
+    assert app.decode_page_cursor(token, 2) == [None, 7]
+
+
+@pytest.mark.parametrize('token', ['', 'not-base64!', 'eyJhIjogMX0', app.encode_page_cursor(1, 2, 3)])
+def test_malformed_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        app.decode_page_cursor(token, 2)
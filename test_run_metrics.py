@@ -0,0 +1,53 @@
+"""Synthetic per-run metrics from the splitmix64 counter RNG (no database needed)"""
+
+import numpy as np
+
+import app
+
+MASK64 = (1 << 64) - 1
+
+
+def splitmix64_reference(key, counter):
+    """Scalar splitmix64: draw `counter` of the stream seeded by `key`, as a float in [0, 1)"""
+    z = (key + 0x9E3779B97F4A7C15 * (counter + 1)) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    z ^= z >> 31
+    return (z >> 11) / float(1 << 53)
+
+
+def test_splitmix64_matches_scalar_reference():
+    keys = [0, 1, 2, 12345, 987654321, 2 ** 40 + 17, 2 ** 63 - 1]
+    for counter in (0, 1, 5):
+        draws = app.splitmix64_uniform(np.array(keys, dtype=np.uint64), counter)
+        assert draws.tolist() == [splitmix64_reference(key, counter) for key in keys]
+
+
+def test_splitmix64_draws_are_uniform_in_unit_interval():
+    draws = app.splitmix64_uniform(np.arange(100000, dtype=np.uint64), 0)
+    assert draws.min() >= 0.0 and draws.max() < 1.0
+    assert abs(draws.mean() - 0.5) < 0.01
+
+
+def test_run_metrics_do_not_depend_on_the_page():
+    run_ids = np.arange(1000, 1200)
+    tool_names = np.array(['VIS101', 'ADE149', 'AMT7', 'AIX3'] * 50)
+    full = app.compute_run_metrics(run_ids, tool_names)
+
+    order = np.random.default_rng(0).permutation(len(run_ids))
+    shuffled = app.compute_run_metrics(run_ids[order], tool_names[order])
+    page = app.compute_run_metrics(run_ids[50:60], tool_names[50:60])
+    for whole, permuted, paged in zip(full, shuffled, page):
+        np.testing.assert_array_equal(whole[order], permuted)
+        np.testing.assert_array_equal(whole[50:60], paged)
+
+
+def test_run_metrics_ranges_and_tool_base_yields():
+    run_ids = np.arange(20000)
+    for name, base in (('VIS101', 92.0), ('ADE149', 88.0), ('AMT7', 90.0), ('AIX3', 85.0)):
+        run_yield, uniformity, defect_density = app.compute_run_metrics(run_ids, [name] * len(run_ids))
+        assert run_yield.min() >= 75.0 and run_yield.max() <= 99.5
+        assert uniformity.min() >= 85.0 and uniformity.max() <= 99.9
+        assert defect_density.min() >= 0.01
+        # base + U(0, 13) - 5, clipped: the median sits near base + 1.5
+        assert abs(np.median(run_yield) - (base + 1.5)) < 0.5
@@ -0,0 +1,108 @@
+"""Shift schedule solver: Hungarian matching and its greedy fallback (no database needed)"""
+
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+import app
+
+
+def brute_force_cost(cost):
+    """Minimum total cost over every matching that covers the smaller side"""
+    n, m = cost.shape
+    if n <= m:
+        return min(cost[range(n), cols].sum() for cols in itertools.permutations(range(m), n))
+    return min(cost[rows, range(m)].sum() for rows in itertools.permutations(range(n), m))
+
+
+def assert_valid_matching(cost, rows, cols):
+    assert len(rows) == len(cols) == min(cost.shape)
+    assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+    assert rows.min() >= 0 and rows.max() < cost.shape[0]
+    assert cols.min() >= 0 and cols.max() < cost.shape[1]
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (3, 3), (5, 5), (6, 6), (2, 6), (6, 2), (4, 7), (7, 4)])
+def test_linear_assignment_is_optimal(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        cost = rng.integers(-50, 50, shape).astype(float)
+        rows, cols = app.linear_assignment(cost)
+        assert_valid_matching(cost, rows, cols)
+        assert cost[rows, cols].sum() == pytest.approx(brute_force_cost(cost))
+
+
+def test_linear_assignment_handles_ties_and_infeasible_cells():
+    cost = np.zeros((4, 4))
+    rows, cols = app.linear_assignment(cost)
+    assert_valid_matching(cost, rows, cols)
+    # Incompatible pairs are priced at zero by the schedule solver; value only where allowed
+    cost = np.array([[0.0, -5.0, 0.0], [-4.0, -6.0, 0.0], [0.0, 0.0, 0.0]])
+    rows, cols = app.linear_assignment(cost)
+    assert cost[rows, cols].sum() == -9.0
+
+
+def test_linear_assignment_gives_up_after_the_deadline():
+    cost = np.random.default_rng(0).random((30, 30))
+    assert app.linear_assignment(cost, deadline=time.monotonic() - 1) is None
+
+
+def test_greedy_assignment_is_a_valid_matching():
+    rng = np.random.default_rng(1)
+    for shape in [(5, 5), (3, 8), (8, 3)]:
+        cost = rng.random(shape)
+        rows, cols = app.greedy_assignment(cost)
+        assert_valid_matching(cost, rows, cols)
+        assert cost[rows, cols].sum() >= brute_force_cost(cost) - 1e-9
+
+
+def test_shift_schedule_meets_demand_and_respects_compatibility():
+    shift_output = np.array([100.0, 80.0, 60.0])
+    shift_value = np.array([[10.0, 8.0], [9.0, 9.5], [7.0, 7.0]])
+    compatible = np.array([[True, False], [True, True], [False, True]])
+    demand = np.array([250.0, 100.0])
+    assignments, methods = app.solve_shift_schedule(shift_output, shift_value, compatible, demand,
+                                                    [1.0, 1.0, 1.0], time.monotonic() + 10)
+    assert set(methods) == {'hungarian'}
+    delivered = np.zeros(2)
+    for shift, tool, process, wafers in assignments:
+        assert compatible[tool, process]
+        assert 0 < wafers <= shift_output[tool]
+        delivered[process] += wafers
+    np.testing.assert_allclose(delivered, demand)
+    # A tool runs at most one process per shift
+    per_shift = [(shift, tool) for shift, tool, _, _ in assignments]
+    assert len(per_shift) == len(set(per_shift))
+
+
+def test_shift_schedule_falls_back_to_greedy_past_the_deadline():
+    compatible = np.ones((3, 2), dtype=bool)
+    assignments, methods = app.solve_shift_schedule(np.array([10.0, 10.0, 10.0]), np.ones((3, 2)), compatible,
+                                                    np.array([15.0, 5.0]), [1.0], time.monotonic() - 1)
+    assert methods == ['greedy']
+    assert sum(wafers for _, _, _, wafers in assignments) == pytest.approx(20.0)
+
+
+def test_shift_schedule_spreads_demand_over_the_horizon():
+    # Either tool could run the whole demand in the first two shifts; it is split evenly instead
+    compatible = np.ones((2, 1), dtype=bool)
+    assignments, _ = app.solve_shift_schedule(np.array([100.0, 100.0]), np.ones((2, 1)), compatible,
+                                              np.array([200.0]), [1.0, 1.0, 1.0, 1.0], time.monotonic() + 10)
+    per_shift = np.zeros(4)
+    for shift, _, _, wafers in assignments:
+        per_shift[shift] += wafers
+    np.testing.assert_allclose(per_shift, [50.0, 50.0, 50.0, 50.0])
+
+
+def test_shift_schedule_weights_shifts_by_throughput_and_carries_shortfalls():
+    compatible = np.ones((1, 1), dtype=bool)
+    # Slower shifts get a smaller slice
+    assignments, _ = app.solve_shift_schedule(np.array([100.0]), np.ones((1, 1)), compatible,
+                                              np.array([90.0]), [1.0, 0.5], time.monotonic() + 10)
+    np.testing.assert_allclose([wafers for _, _, _, wafers in assignments], [60.0, 30.0])
+    # A shift that cannot cover its slice leaves the rest to later shifts
+    assignments, _ = app.solve_shift_schedule(np.array([40.0]), np.ones((1, 1)), compatible,
+                                              np.array([120.0]), [0.5, 1.0, 1.0], time.monotonic() + 10)
+    np.testing.assert_allclose([wafers for _, _, _, wafers in assignments], [20.0, 40.0, 40.0])
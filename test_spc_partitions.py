@@ -0,0 +1,49 @@
+"""Adding incremental SPC partition scans to earlier results (no database needed)"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import app
+
+
+def scan(values_by_event, registers, at):
+    """Scan result shaped like scan_spc_partition's, from raw values and sketch registers"""
+    sketch = app.empty_wafer_sketch()
+    for register, rank in registers.items():
+        sketch[register] = rank
+    events = {}
+    for name, values in values_by_event.items():
+        values = np.array(values, dtype=float)
+        events[name] = {'measurements': len(values), 'value_count': len(values), 'mean': values.mean(),
+                        'm2': float(((values - values.mean()) ** 2).sum()), 'wafer_sketch': sketch.copy(),
+                        'unique_wafers': app.wafer_sketch_estimate(sketch)}
+    totals = {'measurements': sum(len(v) for v in values_by_event.values()), 'wafer_sketch': sketch,
+              'unique_wafers': app.wafer_sketch_estimate(sketch)}
+    return {'totals': totals, 'events': events, 'scanned_at': at, 'watermark': at}
+
+
+def test_merged_scans_match_one_scan_of_all_rows():
+    first = scan({'Bow': [1.0, 2.0, 3.0]}, {5: 2, 9: 1}, datetime(2026, 10, 1))
+    second = scan({'Bow': [10.0, 12.0], 'TTV': [0.5]}, {5: 1, 11: 3}, datetime(2026, 10, 2))
+    merged = app.merge_spc_partition_stats(first, second)
+    whole = scan({'Bow': [1.0, 2.0, 3.0, 10.0, 12.0], 'TTV': [0.5]}, {5: 2, 9: 1, 11: 3}, datetime(2026, 10, 2))
+
+    assert merged['totals']['measurements'] == whole['totals']['measurements'] == 6
+    assert np.array_equal(merged['totals']['wafer_sketch'], whole['totals']['wafer_sketch'])
+    assert merged['totals']['unique_wafers'] == whole['totals']['unique_wafers']
+    bow = merged['events']['Bow']
+    assert bow['measurements'] == bow['value_count'] == 5
+    assert bow['mean'] == pytest.approx(whole['events']['Bow']['mean'])
+    assert bow['m2'] == pytest.approx(whole['events']['Bow']['m2'])
+    assert merged['events']['TTV'] == second['events']['TTV']
+    assert merged['watermark'] == second['watermark']
+
+
+def test_merge_leaves_earlier_results_untouched():
+    first = scan({'Bow': [1.0, 2.0]}, {5: 2}, datetime(2026, 10, 1))
+    second = scan({'Bow': [4.0]}, {5: 4}, datetime(2026, 10, 2))
+    app.merge_spc_partition_stats(first, second)
+    assert first['events']['Bow']['measurements'] == 2
+    assert first['totals']['wafer_sketch'][5] == 2
@@ -0,0 +1,83 @@
+"""Western Electric run rules on the streaming SPC chart state (no database needed)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+
+START = datetime(2026, 1, 1)
+
+
+def chart_with_baseline():
+    """A chart whose limits are set by SPC_MONITOR_MIN_BASELINE points alternating 9, 11"""
+    chart = app.SpcChartState()
+    for i in range(app.SPC_MONITOR_MIN_BASELINE):
+        assert chart.add(9.0 if i % 2 else 11.0, START + timedelta(minutes=i)) == []
+    return chart
+
+
+def feed(chart, values):
+    """Violations raised by each point, in order"""
+    at = START + timedelta(minutes=chart.count)
+    return [chart.add(value, at + timedelta(minutes=i)) for i, value in enumerate(values)]
+
+
+def test_no_rules_before_the_baseline_is_complete():
+    chart = app.SpcChartState()
+    assert all(chart.add(value, START) == [] for value in [10.0] * 5 + [1000.0, -1000.0])
+    assert not chart.summary()['baseline_ready']
+
+
+def test_welford_mean_and_sigma_match_two_pass():
+    values = [9.0, 11.0, 10.5, 8.25, 12.0, 10.0]
+    chart = app.SpcChartState()
+    feed(chart, values)
+    mean = sum(values) / len(values)
+    variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    assert chart.mean == pytest.approx(mean)
+    assert chart.sigma == pytest.approx(variance ** 0.5)
+
+
+def test_rule_1_point_beyond_three_sigma():
+    chart = chart_with_baseline()
+    assert 'rule_1' in feed(chart, [14.5])[0]
+    assert 'rule_1' in feed(chart_with_baseline(), [5.5])[0]
+    assert feed(chart_with_baseline(), [12.5])[0] == []
+
+
+def test_rule_2_two_of_three_beyond_two_sigma():
+    results = feed(chart_with_baseline(), [12.5, 10.0, 12.6])
+    assert 'rule_2' not in results[0]
+    assert 'rule_2' in results[2]
+    # Beyond two sigma but on opposite sides does not count
+    assert 'rule_2' not in feed(chart_with_baseline(), [12.5, 7.4])[1]
+
+
+def test_rule_3_four_of_five_beyond_one_sigma():
+    results = feed(chart_with_baseline(), [11.5, 11.5, 10.0, 11.5, 11.5])
+    assert all('rule_3' not in violated for violated in results[:4])
+    assert 'rule_3' in results[4]
+
+
+def test_rule_4_eight_points_on_one_side():
+    results = feed(chart_with_baseline(), [10.4] * 8)
+    assert all('rule_4' not in violated for violated in results[:7])
+    assert 'rule_4' in results[7]
+
+
+def test_trend_six_points_steadily_increasing():
+    # The baseline ends on 9.0, so the run starts with a step down
+    results = feed(chart_with_baseline(), [8.5, 8.6, 8.7, 8.8, 8.9, 9.0])
+    assert all('trend' not in violated for violated in results[:5])
+    assert 'trend' in results[5]
+    results = feed(chart_with_baseline(), [10.0, 9.9, 9.8, 9.7, 9.6, 9.5])
+    assert 'trend' in results[5]
+
+
+def test_violations_expire_after_later_points():
+    chart = chart_with_baseline()
+    feed(chart, [14.5])
+    assert [v['rule'] for v in chart.active_violations()] == ['rule_1']
+    feed(chart, [11.0, 9.0] * (app.SPC_ACTIVE_VIOLATION_POINTS // 2 + 1))
+    assert chart.active_violations() == []
@@ -0,0 +1,66 @@
+"""Tool x recipe rankings over a sliding window of the run snapshot (no database needed)"""
+
+import numpy as np
+import pytest
+
+import app
+
+TOOLS = {1: 'AMT101', 2: 'AMT102'}
+
+
+def snapshot(runs, watermark):
+    """Manifest and columns like the run snapshot's; runs are (tool, recipe code, completion, hours)"""
+    completion = np.array([np.datetime64(at, 's') for _, _, at, _ in runs], dtype='datetime64[s]')
+    columns = {
+        'run_id': np.arange(1, len(runs) + 1, dtype=np.int64),
+        'tool_id': np.array([tool for tool, _, _, _ in runs], dtype=np.int64),
+        'recipe': np.array([recipe for _, recipe, _, _ in runs], dtype=np.int64),
+        'start': completion - np.array([int(hours * 3600) for _, _, _, hours in runs], dtype='timedelta64[s]'),
+        'completion': completion,
+        'quantity': np.full(len(runs), 100.0),
+    }
+    manifest = {'rows': len(runs), 'watermark': watermark, 'dictionaries': {'recipe': ['OLD-1', 'EPI-2', 'EPI-3']}}
+    return manifest, columns
+
+
+@pytest.fixture
+def matrix(monkeypatch):
+    monkeypatch.setattr(app.tool_catalog, 'by_id', lambda tool_id: {
+        'tool_id': tool_id, 'family_name': 'AMT', 'reactor': {'reactor_name': TOOLS[tool_id]}})
+    monkeypatch.setattr(app, 'REACTOR_ASSIGNMENT_MIN_RUNS', 1)
+    state = {}
+    monkeypatch.setattr(app, 'get_run_columns', lambda: state['snapshot'])
+    monkeypatch.setattr(app.run_snapshot, 'load', lambda: state['snapshot'])
+    matrix = app.ToolRecipeMatrix(days=30)
+    matrix.use = lambda runs, watermark: state.update(snapshot=snapshot(runs, watermark))
+    return matrix
+
+
+def test_rankings_best_first_per_tool_recipe_and_overall(matrix):
+    # Tool 1 runs EPI-2 in 1h, tool 2 in 2h; only tool 2 runs EPI-3
+    matrix.use([(1, 1, '2026-03-01T10:00', 1.0), (2, 1, '2026-03-01T11:00', 2.0),
+                (2, 2, '2026-03-01T12:00', 4.0)], '2026-03-02T00:00:00')
+    ranking = matrix.update()
+    epi2, epi3 = ranking['recipe_index']['EPI-2'], ranking['recipe_index']['EPI-3']
+    tool1, tool2 = ranking['tool_index'][1], ranking['tool_index'][2]
+    assert ranking['tools_by_recipe'][:ranking['ranked_per_recipe'][epi2], epi2].tolist() == [tool1, tool2]
+    assert ranking['recipes_by_tool'][tool2, :ranking['ranked_per_tool'][tool2]].tolist() == [epi2, epi3]
+    assert ranking['best_pairs'][0] == (tool1, epi2)
+    assert ranking['ranked_pairs'] == 3
+    assert matrix.update() is ranking  # nothing new, nothing rebuilt
+
+
+def test_recipes_leave_the_window_but_keep_their_yield(matrix):
+    runs = [(1, 0, '2026-01-01T10:00', 1.0), (1, 1, '2026-03-01T10:00', 1.0), (2, 2, '2026-03-20T10:00', 2.0)]
+    matrix.use(runs, '2026-03-21T00:00:00')
+    ranking = matrix.update()
+    assert ranking['recipe_names'] == ['EPI-2', 'EPI-3']  # OLD-1 last ran in January
+    assert ranking['runs'].shape == (2, 2)
+
+    # Two weeks later the EPI-2 run has expired and EPI-3 ran again
+    matrix.use(runs + [(2, 2, '2026-04-05T10:00', 2.0)], '2026-04-06T00:00:00')
+    ranking = matrix.update()
+    assert ranking['recipe_names'] == ['EPI-3']
+    assert ranking['runs'][ranking['tool_index'][2], 0] == 2
+    assert ranking['runs'].sum() == 2
+    assert set(matrix.recipe_yields()) == {'OLD-1', 'EPI-2', 'EPI-3'}
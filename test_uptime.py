@@ -0,0 +1,87 @@
+"""Tool busy time as the union of run intervals (no database needed)"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+import app
+
+
+def brute_force_union(keys, starts, ends):
+    covered = {}
+    for key, start, end in zip(keys.tolist(), starts.tolist(), ends.tolist()):
+        covered.setdefault(key, set()).update(range(start, end))
+    return {key: len(seconds) for key, seconds in covered.items()}
+
+
+def union(keys, starts, ends):
+    unique_keys, seconds = app.interval_union_seconds(np.array(keys, dtype=np.int64),
+                                                      np.array(starts, dtype=np.int64),
+                                                      np.array(ends, dtype=np.int64))
+    return dict(zip(unique_keys.tolist(), seconds.tolist()))
+
+
+def test_empty_input():
+    keys, seconds = app.interval_union_seconds(*(np.empty(0, dtype=np.int64) for _ in range(3)))
+    assert len(keys) == 0 and len(seconds) == 0
+
+
+def test_overlapping_nested_touching_and_disjoint_intervals():
+    assert union([1, 1], [0, 5], [10, 15]) == {1: 15}  # overlapping
+    assert union([1, 1], [0, 2], [10, 5]) == {1: 10}  # nested
+    assert union([1, 1], [0, 10], [10, 20]) == {1: 20}  # touching
+    assert union([1, 1], [0, 30], [10, 40]) == {1: 20}  # disjoint
+    assert union([1, 1, 1], [50, 0, 5], [60, 10, 8]) == {1: 20}  # unsorted input
+
+
+def test_keys_do_not_merge_with_each_other():
+    # Key 2's interval lies inside key 1's, and key 3 starts where key 1 ends
+    assert union([1, 2, 3, 1], [0, 10, 100, 40], [100, 20, 110, 60]) == {1: 100, 2: 10, 3: 10}
+
+
+def test_matches_brute_force_on_random_intervals():
+    rng = np.random.default_rng(42)
+    for _ in range(200):
+        n = int(rng.integers(1, 40))
+        keys = rng.integers(0, 5, n)
+        starts = rng.integers(0, 500, n)
+        ends = starts + rng.integers(1, 120, n)
+        assert union(keys, starts, ends) == brute_force_union(keys, starts, ends)
+
+
+def test_daily_busy_seconds_splits_runs_at_midnight():
+    def ts(text):
+        return np.datetime64(text, 's')
+
+    # In completion order, like the snapshot. Tool 7: 22:00-02:00 across midnight plus an
+    # overlapping 23:00-23:30 run; tool 9: one hour on the second day
+    columns = {
+        'start': np.array([ts('2026-03-01T23:00'), ts('2026-03-01T22:00'), ts('2026-03-02T05:00')]),
+        'completion': np.array([ts('2026-03-01T23:30'), ts('2026-03-02T02:00'), ts('2026-03-02T06:00')]),
+        'tool_id': np.array([7, 7, 9], dtype=np.int64),
+    }
+    busy = app.compute_daily_busy_seconds(columns, date(2026, 3, 1), date(2026, 3, 2))
+    as_dict = {day: dict(zip(tools.tolist(), seconds.tolist())) for day, (tools, seconds) in busy.items()}
+    assert as_dict == {date(2026, 3, 1): {7: 2 * 3600}, date(2026, 3, 2): {7: 2 * 3600, 9: 3600}}
+
+
+def test_uptime_window_defaults_to_the_last_full_days():
+    first, last = app.uptime_window(date(2026, 3, 31))
+    assert last == date(2026, 3, 30)
+    assert (last - first).days + 1 == app.UPTIME_WINDOW_DAYS
+
+
+def test_uptime_window_accepts_a_range_inside_the_kept_days():
+    assert app.uptime_window(date(2026, 3, 31), date(2026, 3, 1), date(2026, 3, 7)) == (date(2026, 3, 1), date(2026, 3, 7))
+    assert app.uptime_window(date(2026, 3, 31), start=date(2026, 3, 20)) == (date(2026, 3, 20), date(2026, 3, 30))
+
+
+@pytest.mark.parametrize('start, end', [
+    (date(2026, 3, 7), date(2026, 3, 1)),  # reversed
+    (date(2026, 3, 1), date(2026, 3, 31)),  # reaches the unfinished snapshot day
+    (date(2024, 1, 1), date(2024, 1, 31)),  # older than UPTIME_MAX_DAYS
+])
+def test_uptime_window_rejects_ranges(start, end):
+    with pytest.raises(ValueError):
+        app.uptime_window(date(2026, 3, 31), start, end)